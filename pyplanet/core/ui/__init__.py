@@ -69,7 +69,7 @@ class _BaseUIManager:
 		:type manialink: pyplanet.core.ui.components.manialink._ManiaLink
 		"""
 		queries = list()
-		if isinstance(players, list):
+		if isinstance(players, (list, tuple)):
 			for_logins = [p.login if isinstance(p, Player) else p for p in players]
 		elif manialink.player_data:
 			for_logins = list(manialink.player_data.keys())
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 
 def format_time(time, hide_hours_when_zero=True, hide_milliseconds=False):
@@ -27,3 +28,34 @@ def format_time(time, hide_hours_when_zero=True, hide_milliseconds=False):
 	if hide_milliseconds:
 		return formatted_time + '{:02d}'.format(seconds)
 	return formatted_time + '{:02d}.{:03d}'.format(seconds, millis)
+
+
+def format_times(times, hide_hours_when_zero=True, hide_milliseconds=False):
+	"""
+	Format a sequence of integer millisecond times at once. The time components are calculated for all values in a
+	single vectorized pass, the string formatting itself is still done per value. This is only slightly faster than
+	calling :func:`format_time` for every value, mostly useful to format a whole list column in one call.
+
+	:param times: Iterable of integer times in milliseconds.
+	:param hide_hours_when_zero: Hide the hours when there are zero hours.
+	:type hide_hours_when_zero: bool
+	:param hide_milliseconds: Hide the milliseconds.
+	:type hide_milliseconds: bool
+	:return: List of string outputs, in the same order as the input.
+	:rtype: list
+	"""
+	hours, rest = np.divmod(np.asarray(times, dtype=np.int64), 60 * 60 * 1000)
+	minutes, rest = np.divmod(rest, 60 * 1000)
+	seconds, millis = np.divmod(rest, 1000)
+
+	formatted_times = list()
+	for hour, minute, second, milli in zip(hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist()):
+		if hour > 0 or not hide_hours_when_zero:
+			formatted_time = '{:02d}:{:02d}:'.format(hour, minute)
+		else:
+			formatted_time = '{}:'.format(minute)
+		if hide_milliseconds:
+			formatted_times.append(formatted_time + '{:02d}'.format(second))
+		else:
+			formatted_times.append(formatted_time + '{:02d}.{:03d}'.format(second, milli))
+	return formatted_times
@@ -1,10 +1,10 @@
-import math
-import re
+import operator
 import logging
 import pandas as pd
 import numpy as np
 
 from asyncio import iscoroutinefunction
+from functools import reduce
 from peewee import Field
 
 from pyplanet.utils import style
@@ -15,6 +15,30 @@ from pyplanet.views.template import TemplateView
 
 logger = logging.getLogger(__name__)
 
+_PAGE_TARGETS = {
+	'list_button_first': lambda view: 1,
+	'list_button_prev_10': lambda view: view.page - 10,
+	'list_button_prev': lambda view: view.page - 1,
+	'list_button_next': lambda view: view.page + 1,
+	'list_button_next_10': lambda view: view.page + 10,
+	'list_button_last': lambda view: view.num_pages,
+}
+
+
+def _parse_index(value):
+	# Only accept plain digits, int() would also take signs, whitespace and underscores.
+	if not value.isdigit():
+		raise ValueError('Invalid index: {}'.format(value))
+	return int(value)
+
+
+def _is_coroutine_action(item):
+	# Cache the coroutine check on the field/action/button definition itself, it never changes after setup.
+	is_coroutine = item.get('_is_coro')
+	if is_coroutine is None:
+		is_coroutine = item['_is_coro'] = iscoroutinefunction(item.get('action'))
+	return is_coroutine
+
 
 class ListView(TemplateView):
 	"""
@@ -27,6 +51,10 @@ class ListView(TemplateView):
 	You can override ``get_fields()``, ``get_actions()``, ``get_query()`` if you need any customization or use a self method
 	or variable in one of your properties.
 
+	Columns with many (numeric) values can provide a ``batch_renderer`` instead of a ``renderer``. It is called once per
+	render with the list of raw values of the current page and the field, and should return one string per value in the
+	same order, for example ``lambda values, field: times.format_times(values)``.
+
 	.. note::
 
 		The design and some behaviour can change in updates of PyPlanet. We aim to provide backward compatibility as much
@@ -86,17 +114,27 @@ class ListView(TemplateView):
 
 		self.provide_search = True
 
+		self._fields_cache = None
+		self._fields_source = None
+		self._fields_normalized = None
+		self._fields_width = 0
+		self._searchable_source = None
+		self._searchable = list()
+
+		self._count_cache_key = None
+		self._count_cache = 0
+		self._keep_count = False
+
+		self._batch_rendered = dict()
+		self._batch_rows = dict()
+
 		# Setup the receivers.
 		self.subscribe('list_button_close', self.close)
 		self.subscribe('list_button_refresh', self.refresh)
 		self.subscribe('list_button_search', self._search)
 
-		self.subscribe('list_button_first', self._first_page)
-		self.subscribe('list_button_prev_10', self._prev_10_pages)
-		self.subscribe('list_button_prev', self._prev_page)
-		self.subscribe('list_button_next', self._next_page)
-		self.subscribe('list_button_next_10', self._next_10_pages)
-		self.subscribe('list_button_last', self._last_page)
+		for page_action in _PAGE_TARGETS:
+			self.subscribe(page_action, self._jump)
 
 	@property
 	def order(self):
@@ -112,12 +150,8 @@ class ListView(TemplateView):
 	async def handle_catch_all(self, player, action, values, **kwargs):
 		# Sorting the column:
 		if action.startswith('list_header_'):
-			match = re.search('^list_header_([0-9]+)$', action)
-			if len(match.groups()) != 1:
-				return
-
 			try:
-				col = int(match.group(1))
+				col = _parse_index(action[len('list_header_'):])
 				fields = await self.get_fields()
 				field = fields[col]
 			except Exception as e:
@@ -125,7 +159,7 @@ class ListView(TemplateView):
 				return
 
 			# Check if sorting is defined + true.
-			if 'sorting' not in field or not field['sorting'] or not field['index']:
+			if not field.get('sorting') or not field['index']:
 				return
 
 			# Sort on column
@@ -153,18 +187,13 @@ class ListView(TemplateView):
 			await self.refresh(player)
 
 		elif action.startswith('list_body_') or action.startswith('list_action_'):
-			if action.startswith('list_body_'):
-				match = re.search('^list_body_([0-9]+)_([0-9]+)$', action)
-				trigger = 'body'
-			else:
-				match = re.search('^list_action_([0-9]+)_([0-9]+)$', action)
-				trigger = 'action'
-			if len(match.groups()) != 2:
-				return
+			trigger = 'body' if action.startswith('list_body_') else 'action'
+			prefix = 'list_body_' if trigger == 'body' else 'list_action_'
 
 			try:
-				row = int(match.group(1))
-				idx = int(match.group(2))
+				row, idx = action[len(prefix):].split('_')
+				row = _parse_index(row)
+				idx = _parse_index(idx)
 				if trigger == 'body':
 					field = (await self.get_fields())[idx]
 				else:
@@ -176,19 +205,14 @@ class ListView(TemplateView):
 				return
 
 			# Execute action/target method.
-			if iscoroutinefunction(action):
+			if _is_coroutine_action(field):
 				await action(player, values, instance, view=self)
 			else:
 				action(player, values, instance, view=self)
 
 		elif action.startswith('list_buttons_'):
-			match = re.search('^list_buttons_([0-9]+)$', action)
-
-			if len(match.groups()) != 1:
-				return
-
 			try:
-				button = int(match.group(1))
+				button = _parse_index(action[len('list_buttons_'):])
 				field = (await self.get_buttons())[button]
 				action = field['action']
 			except Exception as e:
@@ -196,14 +220,15 @@ class ListView(TemplateView):
 				return
 
 			# Execute action/target method.
-			if iscoroutinefunction(action):
+			if _is_coroutine_action(field):
 				await action(player, values, view=self)
 			else:
 				action(player, values, view=self)
 
 	@property
 	def num_pages(self):
-		return int(math.ceil(self.count / self.num_per_page))
+		per = self.num_per_page
+		return (self.count + per - 1) // per if per else 0
 
 	async def close(self, player, *args, **kwargs):
 		"""
@@ -214,7 +239,7 @@ class ListView(TemplateView):
 		"""
 		if self.player_data and player.login in self.player_data:
 			del self.player_data[player.login]
-		await self.hide(player_logins=[player.login])
+		await self.hide(player_logins=(player.login,))
 
 		if self.single_list:
 			# Clear the lock on the player list display.
@@ -240,6 +265,10 @@ class ListView(TemplateView):
 		if not player:
 			raise Exception('No player/login given to display the list to!')
 
+		# Data could have changed since the last display, only page navigation may reuse the last count.
+		if not self._keep_count:
+			self._count_cache_key = None
+
 		# Check and close other list of user.
 		if self.single_list:
 			player = player if isinstance(player, Player) \
@@ -256,10 +285,23 @@ class ListView(TemplateView):
 			# Set lock on player.
 			player.attributes.set('pyplanet.views.list_displayed', self.id)
 
-		return await super().display(player_logins=[login])
+		return await super().display(player_logins=(login,))
 
 	async def get_fields(self):
-		return self.fields
+		if self._fields_cache is None or self._fields_source is not self.fields:
+			self._fields_source = self.fields
+			self._fields_cache = list(self.fields)
+		return self._fields_cache
+
+	def invalidate_fields(self):
+		"""
+		Clear the cached field definitions. Call this after mutating ``self.fields`` in place, replacing the list is
+		detected automatically.
+		"""
+		self._fields_cache = None
+		self._fields_source = None
+		self._fields_normalized = None
+		self._searchable_source = None
 
 	async def get_title(self):
 		return self.title
@@ -278,10 +320,18 @@ class ListView(TemplateView):
 	async def apply_filter(self, query):
 		if not self.search_text:
 			return query
-		for field in self.fields:
-			if 'searching' in field and field['searching']:
-				query = query.orwhere(getattr(self.model, field['index']).contains(self.search_text))
-		return query
+		searchable = self._get_searchable(await self.get_fields())
+		if not searchable:
+			return query
+		return query.where(reduce(operator.or_, [
+			getattr(self.model, index).contains(self.search_text) for index in searchable
+		]))
+
+	def _get_searchable(self, fields):
+		if fields is not self._searchable_source:
+			self._searchable_source = fields
+			self._searchable = [field['index'] for field in fields if field.get('searching') and field.get('index')]
+		return self._searchable
 
 	async def apply_ordering(self, query):
 		if not self.order:
@@ -289,8 +339,12 @@ class ListView(TemplateView):
 		return query.order_by(self.order)
 
 	async def apply_pagination(self, query):
-		# Get count before pagination.
-		self.count = await self.model.objects.count(query)
+		# Get count before pagination. Ordering doesn't change the count, so leave it out of the cache key.
+		key = query.order_by().sql()
+		if key != self._count_cache_key:
+			self._count_cache = await self.model.objects.count(query)
+			self._count_cache_key = key
+		self.count = self._count_cache
 		return query.paginate(self.page, self.num_per_page)
 
 	async def get_object_data(self):
@@ -309,7 +363,7 @@ class ListView(TemplateView):
 	async def get_context_data(self):
 		context = await super().get_context_data()
 
-		# Add dynamic data from query.
+		# Add dynamic data from query. Fields are retrieved afterwards, as loading the data can change them.
 		context.update(await self.get_object_data())
 
 		fields = await self.get_fields()
@@ -317,25 +371,46 @@ class ListView(TemplateView):
 		buttons = await self.get_buttons()
 
 		# Process fields + actions (normalize)
-		# Calculate positions of fields
-		left = 0
+		# Calculate positions of fields, only needed once for the same list of fields.
+		if fields is not self._fields_normalized:
+			left = 0
+			for field in fields:
+				field['left'] = left
+				left += field['width']
+				if 'type' not in field:
+					field['type'] = 'label'
+				if 'safe' not in field:
+					field['safe'] = False
+			self._fields_normalized = fields
+			self._fields_width = int(left)
+		fields_width = self._fields_width
+
+		# Render the batch columns of the current page in one call per field. Kept on the view, as field definitions
+		# can be shared between view instances.
+		self._batch_rendered = dict()
+		self._batch_rows = dict()
 		for field in fields:
-			field['left'] = left
-			left += field['width']
-			if 'type' not in field:
-				field['type'] = 'label'
-			if 'safe' not in field:
-				field['safe'] = False
+			batch_renderer = field.get('batch_renderer')
+			if batch_renderer:
+				if not self._batch_rows:
+					self._batch_rows = {id(row): idx for idx, row in enumerate(self.objects)}
+				values = [self._get_value(row, field) for row in self.objects]
+				rendered = list(batch_renderer(values, field))
+				if len(rendered) != len(values):
+					raise ValueError('Batch renderer of field \'{}\' returned {} values for {} rows!'.format(
+						field['index'], len(rendered), len(values)
+					))
+				self._batch_rendered[id(field)] = rendered
 
+		for field in fields:
 			field['_sort'] = None
 			if self.sort_field is not None and field['index'] == self.sort_field['index']:
 				field['_sort'] = self.sort_order
-		fields_width = int(left)
 
 		left = 0
 		for action in actions:
 			action['left'] = left
-			left += action['width'] if 'width' in action else 5
+			left += action.get('width', 5)
 			if 'type' not in action:
 				action['type'] = 'quad'
 			if 'safe' not in action:
@@ -367,12 +442,21 @@ class ListView(TemplateView):
 		return context
 
 	def _render_field(self, row, field):
-		if 'renderer' in field:
-			return field['renderer'](row, field)
+		rendered = self._batch_rendered.get(id(field))
+		if rendered is not None and id(row) in self._batch_rows:
+			return rendered[self._batch_rows[id(row)]]
+		renderer = field.get('renderer')
+		if renderer:
+			return renderer(row, field)
+		return str(self._get_value(row, field))
+
+	def _get_value(self, row, field):
 		if isinstance(row, dict):
-			return str(row[field['index']])
-		else:
-			return str(getattr(row, field['index']))
+			return row[field['index']]
+		getter = field.get('_getter')
+		if getter is None:
+			getter = field['_getter'] = operator.attrgetter(field['index'])
+		return getter(row)
 
 	async def _search(self, player, _, values, *args, **kwargs):
 		search_text = values['list_search_field']
@@ -384,37 +468,19 @@ class ListView(TemplateView):
 		self.page = 1
 		await self.refresh(player)
 
-	async def _first_page(self, player, *args, **kwargs):
-		self.page = 1
-		await self.refresh(player)
-
-	async def _last_page(self, player, *args, **kwargs):
-		self.page = self.num_pages
-		await self.refresh(player)
-
-	async def _next_page(self, player, *args, **kwargs):
-		if self.page + 1 <= self.num_pages:
-			self.page += 1
+	async def _jump(self, player, action, *args, **kwargs):
+		target = _PAGE_TARGETS.get(action.rsplit('__', 1)[-1])
+		if not target:
+			return
+		page = max(1, min(target(self), self.num_pages or 1))
+		if page == self.page:
+			return
+		self.page = page
+		self._keep_count = True
+		try:
 			await self.refresh(player)
-
-	async def _next_10_pages(self, player, *args, **kwargs):
-		if self.page + 10 <= self.num_pages:
-			self.page += 10
-		else:
-			self.page = self.num_pages
-		await self.refresh(player)
-
-	async def _prev_page(self, player, *args, **kwargs):
-		if self.page - 1 > 0:
-			self.page -= 1
-			await self.refresh(player)
-
-	async def _prev_10_pages(self, player, *args, **kwargs):
-		if self.page - 10 > 0:
-			self.page -= 10
-		else:
-			self.page = 1
-		await self.refresh(player)
+		finally:
+			self._keep_count = False
 
 
 class ManualListView(ListView):
@@ -453,8 +519,8 @@ class ManualListView(ListView):
 			return frame
 		query = list()
 		for field in await self.get_fields():
-			if 'searching' in field and field['searching']:
-				if 'search_strip_styles' in field and field['search_strip_styles']:
+			if field.get('searching'):
+				if field.get('search_strip_styles'):
 					query.append(
 						frame[field['index']].apply(lambda x: self.search_text.lower() in style.style_strip(str(x).lower()) if x else False)
 					)
@@ -1,8 +1,15 @@
 import asynctest
+import peewee
+
+from types import SimpleNamespace
+
+from pyplanet.utils import times
 
 from pyplanet.core import Controller
 from pyplanet.views.generics import AlertView
 from pyplanet.views.generics.alert import PromptView
+from pyplanet.views.generics.list import ListView
+from pyplanet.views.template import TemplateView
 
 
 class TestGenericViews(asynctest.TestCase):
@@ -40,3 +47,184 @@ class TestGenericViews(asynctest.TestCase):
 		view = PromptView(message='TestMessage', size='lg')
 		body = await view.render()
 		assert 'TestMessage' in body
+
+
+class ItemObjects:
+	def __init__(self):
+		self.counts = 0
+
+	async def count(self, query):
+		self.counts += 1
+		return query.count()
+
+
+class Item(peewee.Model):
+	name = peewee.CharField()
+	group = peewee.CharField()
+
+	objects = ItemObjects()
+
+	class Meta:
+		database = peewee.SqliteDatabase(':memory:')
+
+	@classmethod
+	async def execute(cls, query):
+		return list(query)
+
+
+class ItemListView(ListView):
+	model = Item
+	query = Item.select()
+	single_list = False
+	fields = [
+		{'name': 'Name', 'index': 'name', 'searching': True, 'sorting': True, 'width': 50},
+		{'name': 'Group', 'index': 'group', 'searching': True, 'sorting': True, 'width': 50},
+	]
+
+
+class RefreshCountingListView(ItemListView):
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.refreshes = 0
+
+	async def refresh(self, player, *args, **kwargs):
+		self.refreshes += 1
+		await super().refresh(player, *args, **kwargs)
+
+
+class NestedListView(ItemListView):
+	async def get_object_data(self):
+		self.objects = [SimpleNamespace(map=SimpleNamespace(name=1500))]
+		return {'objects': self.objects}
+
+
+async def render_display(view, player_logins=None, **kwargs):
+	view.context = await view.get_context_data()
+
+
+class TestListView(asynctest.TestCase):
+
+	def setUp(self):
+		Item._meta.database.connect()
+		Item.create_table()
+		Item.objects.counts = 0
+		self.patcher = asynctest.patch.object(TemplateView, 'display', new=render_display)
+		self.patcher.start()
+
+	def tearDown(self):
+		self.patcher.stop()
+		Item._meta.database.close()
+
+	def create_items(self, amount, group='default'):
+		for idx in range(amount):
+			Item.create(name='item {}'.format(idx), group=group)
+
+	async def test_click_indices(self):
+		clicks = list()
+		view = ListView()
+		view.fields = [
+			{'name': 'Name', 'index': 'name', 'sorting': True, 'action': lambda *args, **kwargs: clicks.append(args[2])},
+		]
+		view.objects = ['first', 'last']
+
+		for action in (
+			'list_body_-1_0', 'list_body_+1_0', 'list_body_ 1_0', 'list_body_1_-0', 'list_header_-1', 'list_body_9_1_0',
+			'list_body_garbage_1_0', 'list_action_body_0_0',
+		):
+			await view.handle_catch_all(None, action, dict())
+		assert clicks == []
+		assert view.sort_field is None
+
+		await view.handle_catch_all(None, 'list_body_1_0', dict())
+		assert clicks == ['last']
+
+	async def test_count_cache(self):
+		self.create_items(45)
+		view = ItemListView()
+		await view.display(player='login')
+		assert view.count == 45 and view.num_pages == 3
+
+		# Page navigation reuses the count.
+		await view._jump('login', '{}__list_button_next'.format(view.id))
+		assert view.page == 2 and Item.objects.counts == 1
+
+		# Displaying again after the data changed recounts.
+		self.create_items(20)
+		await view.display(player='login')
+		assert view.count == 65 and view.num_pages == 4 and Item.objects.counts == 2
+		await view._jump('login', '{}__list_button_last'.format(view.id))
+		assert view.page == 4 and Item.objects.counts == 2
+
+		# A different query recounts, even when navigating.
+		view.query = Item.select().where(Item.name == 'item 0')
+		await view._jump('login', '{}__list_button_first'.format(view.id))
+		assert view.count == 2 and Item.objects.counts == 3
+
+	async def test_search_respects_query(self):
+		self.create_items(3, group='visible')
+		self.create_items(3, group='hidden')
+		view = ItemListView()
+		view.query = Item.select().where(Item.group == 'visible')
+		view.search_text = 'item 1'
+
+		query = await view.apply_filter(await view.get_query())
+		assert [(item.name, item.group) for item in query] == [('item 1', 'visible')]
+
+	async def test_page_navigation(self):
+		view = RefreshCountingListView()
+		await view.display(player='login')
+		action = '{}__list_button_{}'.format
+
+		# Last page of an empty list stays on the first page.
+		await view._jump('login', action(view.id, 'last'))
+		assert view.page == 1 and view.refreshes == 0
+
+		self.create_items(45)
+		await view.refresh('login')
+		view.refreshes = 0
+
+		# Jumping 10 pages clamps to the valid range.
+		await view._jump('login', action(view.id, 'next_10'))
+		assert view.page == 3 and view.refreshes == 1
+		await view._jump('login', action(view.id, 'prev_10'))
+		assert view.page == 1 and view.refreshes == 2
+
+		# Buttons that don't change the page don't refresh.
+		await view._jump('login', action(view.id, 'prev'))
+		await view._jump('login', action(view.id, 'first'))
+		assert view.page == 1 and view.refreshes == 2
+		await view._jump('login', action(view.id, 'last'))
+		await view._jump('login', action(view.id, 'next'))
+		assert view.page == 3 and view.refreshes == 3
+
+	async def test_batch_renderer(self):
+		Item.create(name='1500', group='default')
+		Item.create(name='61000', group='default')
+		view = ItemListView()
+		view.fields = [
+			{'name': 'Time', 'index': 'name', 'width': 50, 'batch_renderer': lambda values, field: times.format_times(values)},
+			{'name': 'Group', 'index': 'group', 'width': 50},
+		]
+		await view.display(player='login')
+		time_field, group_field = view.context['fields']
+		assert [view._render_field(row, time_field) for row in view.objects] == ['0:01.500', '1:01.000']
+		assert view._render_field(view.objects[0], group_field) == 'default'
+		assert view._batch_rendered[id(time_field)] == ['0:01.500', '1:01.000']
+
+		# Batch renderers have to return a value for every row.
+		time_field['batch_renderer'] = lambda values, field: values[:1]
+		with self.assertRaises(ValueError):
+			await view.display(player='login')
+
+	async def test_batch_renderer_dotted_index(self):
+		view = NestedListView()
+		view.fields = [
+			{'name': 'Time', 'index': 'map.name', 'width': 50},
+			{
+				'name': 'Batch', 'index': 'map.name', 'width': 50,
+				'batch_renderer': lambda values, field: times.format_times(values),
+			},
+		]
+		await view.get_context_data()
+		assert view._render_field(view.objects[0], view.fields[0]) == '1500'
+		assert view._render_field(view.objects[0], view.fields[1]) == '0:01.500'
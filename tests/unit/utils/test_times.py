@@ -21,3 +21,12 @@ def test_time_parsing():
 	raw = 6005195
 	expect = '01:40:05.195'
 	assert times.format_time(raw) == expect
+
+
+def test_batch_time_parsing():
+	raw = [14004, 20135, 65195, 605195, 6005195]
+	assert times.format_times(raw) == [times.format_time(time) for time in raw]
+	assert times.format_times(raw, hide_hours_when_zero=False, hide_milliseconds=True) == [
+		times.format_time(time, hide_hours_when_zero=False, hide_milliseconds=True) for time in raw
+	]
+	assert times.format_times([]) == []